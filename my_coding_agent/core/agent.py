@@ -146,6 +146,8 @@ EXAMPLES:
 - "show me main.py" → read_file(filepath="main.py")
 - "create hello.py" → write_file(filepath="hello.py", content='''print("Hello, World!")''')
 - "list files" → list_files(directory=".")
+- "how big are the folders here" → list_files(directory=".", dir_sizes="true")
+- "show the first 50 lines of the diff" → git_diff(max_lines="50")
 - "hello" → Natural conversational response
 
 IMPORTANT: For write_file, always include both filepath and content parameters with triple quotes for multi-line content.
@@ -402,7 +404,8 @@ print("Simple calculator functions created")'''
         tool_name = plan["tool"]
         params = plan["params"]
 
-        if tool_name not in self.tools:
+        tool_func = self.tools.get(tool_name)
+        if tool_func is None:
             return f"❌ Unknown tool: {tool_name}"
 
         try:
@@ -419,7 +422,6 @@ print("Simple calculator functions created")'''
             if self.debug:
                 print(f"🔧 Executing: {tool_name}({params})")
 
-            tool_func = self.tools[tool_name]
             result = tool_func(**params)
 
             return result
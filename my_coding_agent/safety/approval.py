@@ -1,11 +1,35 @@
 """
 Safety Approval System - User confirmation for destructive operations
 """
+import os
+import re
 from typing import Dict, Any, Optional
 from enum import Enum
 from dataclasses import dataclass
 
 
+def _substring_pattern(substrings) -> "re.Pattern":
+    """One regex that finds any of the given substrings in a single pass"""
+    return re.compile('|'.join(map(re.escape, substrings)))
+
+
+# Shell command substrings by risk level (checked against the lowercased command)
+_CRITICAL_COMMAND_RE = _substring_pattern([
+    'rm -rf', 'del /f', 'format', 'fdisk', 'mkfs',
+    'shutdown', 'reboot', 'halt', 'poweroff',
+    'dd if=', 'chmod 777', 'chown root', 'sudo rm'
+])
+_HIGH_RISK_COMMAND_RE = _substring_pattern([
+    'rm ', 'del ', 'rmdir', 'move', 'mv ',
+    'chmod', 'chown', 'sudo', 'su ',
+    'kill', 'pkill', 'killall'
+])
+_MEDIUM_RISK_COMMAND_RE = _substring_pattern([
+    'cp ', 'copy', 'wget', 'curl', 'git push',
+    'npm install', 'pip install', 'apt install'
+])
+
+
 class RiskLevel(Enum):
     """Risk levels for operations"""
     SAFE = "safe"           # No approval needed
@@ -114,8 +138,6 @@ class SafetyApprovalSystem:
     
     def _assess_file_deletion_risk(self, filepath: str, **kwargs) -> RiskLevel:
         """Assess risk of file deletion"""
-        import os
-        
         # Check if file exists
         if not os.path.exists(filepath):
             return RiskLevel.SAFE
@@ -144,8 +166,6 @@ class SafetyApprovalSystem:
     
     def _assess_folder_deletion_risk(self, folderpath: str, **kwargs) -> RiskLevel:
         """Assess risk of folder deletion"""
-        import os
-        
         if not os.path.exists(folderpath):
             return RiskLevel.SAFE
         
@@ -179,8 +199,6 @@ class SafetyApprovalSystem:
     
     def _assess_file_write_risk(self, filepath: str, content: str = "", **kwargs) -> RiskLevel:
         """Assess risk of file writing"""
-        import os
-        
         # Check if overwriting existing file
         if os.path.exists(filepath):
             # Critical files
@@ -200,37 +218,12 @@ class SafetyApprovalSystem:
         """Assess risk of shell command execution"""
         command_lower = command.lower()
         
-        # Critical commands
-        critical_commands = [
-            'rm -rf', 'del /f', 'format', 'fdisk', 'mkfs',
-            'shutdown', 'reboot', 'halt', 'poweroff',
-            'dd if=', 'chmod 777', 'chown root', 'sudo rm'
-        ]
-        
-        for critical in critical_commands:
-            if critical in command_lower:
-                return RiskLevel.CRITICAL
-        
-        # High risk commands
-        high_risk = [
-            'rm ', 'del ', 'rmdir', 'move', 'mv ',
-            'chmod', 'chown', 'sudo', 'su ',
-            'kill', 'pkill', 'killall'
-        ]
-        
-        for high in high_risk:
-            if high in command_lower:
-                return RiskLevel.HIGH
-        
-        # Medium risk commands
-        medium_risk = [
-            'cp ', 'copy', 'wget', 'curl', 'git push',
-            'npm install', 'pip install', 'apt install'
-        ]
-        
-        for medium in medium_risk:
-            if medium in command_lower:
-                return RiskLevel.MEDIUM
+        if _CRITICAL_COMMAND_RE.search(command_lower):
+            return RiskLevel.CRITICAL
+        if _HIGH_RISK_COMMAND_RE.search(command_lower):
+            return RiskLevel.HIGH
+        if _MEDIUM_RISK_COMMAND_RE.search(command_lower):
+            return RiskLevel.MEDIUM
         
         return RiskLevel.LOW
 
@@ -352,7 +345,8 @@ class SafetyApprovalSystem:
 
         # Higher risk if writing to important files
         if filepath:
-            if any(important in filepath.lower() for important in
+            filepath_lower = filepath.lower()  # Lowercased once, not per pattern
+            if any(important in filepath_lower for important in
                    ['main.py', '__init__.py', 'setup.py', 'config']):
                 return RiskLevel.MEDIUM
 
@@ -369,7 +363,8 @@ class SafetyApprovalSystem:
         refactor_type = kwargs.get('refactor_type', '')
 
         # Higher risk for important files
-        if any(important in filepath.lower() for important in
+        filepath_lower = filepath.lower()
+        if any(important in filepath_lower for important in
                ['main.py', '__init__.py', 'setup.py']):
             return RiskLevel.HIGH
 
@@ -67,6 +67,89 @@ def test_analysis_tools_direct():
     print(result[:300] + "..." if len(result) > 300 else result)
     print("-" * 50)
 
+def test_shared_analysis_context():
+    """Test that code_quality parses the file once for all passes"""
+    from tools.analysis_tools import load_analysis_context, _parse_source
+    from tools.security_tools import CodeQualityTool
+    
+    print("\n=== TESTING SHARED ANALYSIS CONTEXT ===\n")
+    
+    ctx = load_analysis_context("main.py")
+    assert ctx.tree is not None
+    assert load_analysis_context("main.py") is ctx  # Cached by (path, mtime, size)
+    
+    misses = _parse_source.cache_info().misses
+    result = CodeQualityTool().execute("main.py")
+    print(result[:300] + "..." if len(result) > 300 else result)
+    assert _parse_source.cache_info().misses == misses
+
+def _reference_complexity(node):
+    """Cyclomatic complexity from a plain ast.walk of node's subtree"""
+    import ast
+    from tools.analysis_tools import _DECISION_NODES
+    
+    complexity = 1
+    for child in ast.walk(node):
+        if type(child) in _DECISION_NODES:
+            complexity += 1
+        elif isinstance(child, ast.BoolOp):
+            complexity += len(child.values) - 1
+    return complexity
+
+def test_complexity_single_pass_matches_walk():
+    """Test that the one-pass complexity visitor matches per-function ast.walk results"""
+    import ast
+    import glob
+    from tools.analysis_tools import ComplexityAnalyzerTool
+    
+    print("\n=== TESTING SINGLE-PASS COMPLEXITY ===\n")
+    
+    sample = '''
+class Outer:
+    def method(self, a, b):
+        if a and b or not a:
+            for i in range(3):
+                while i:
+                    i -= 1
+        def inner(x):
+            try:
+                with open(x) as f:
+                    return f.read() if x else None
+            except OSError:
+                return a or b or x
+        return inner
+
+async def coroutine(y):
+    async for item in y:
+        if item:
+            return item
+
+def top(z):
+    class Local:
+        def deep(self):
+            return z and self
+    return Local
+'''
+    sources = [sample] + [open(path, encoding='utf-8').read() for path in sorted(glob.glob("tools/*.py"))]
+    analyzer = ComplexityAnalyzerTool()
+    
+    for source in sources:
+        tree = ast.parse(source)
+        metrics = analyzer._calculate_metrics(tree, source)
+        functions = [node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
+        
+        assert metrics['functions'] == len(functions)
+        assert metrics['classes'] == sum(isinstance(node, ast.ClassDef) for node in ast.walk(tree))
+        assert metrics['cyclomatic_complexity'] == _reference_complexity(tree)
+        assert [(d['name'], d['line'], d['complexity']) for d in metrics['function_details']] == [
+            (node.name, node.lineno, _reference_complexity(node)) for node in functions
+        ]
+    
+    details = analyzer._calculate_metrics(ast.parse(sample), sample)['function_details']
+    print(details)
+    assert [d['name'] for d in details] == ['top', 'method', 'inner', 'deep']
+    assert [d['complexity'] for d in details] == [2, 10, 5, 2]
+
 def create_test_file():
     """Create a test file with various issues for analysis"""
     test_code = '''#!/usr/bin/env python3
@@ -140,3 +223,4 @@ if __name__ == "__main__":
     create_test_file()
     test_analysis_tools_direct()
     test_analysis_tools()
+    test_complexity_single_pass_matches_walk()
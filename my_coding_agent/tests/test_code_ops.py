@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Test code tools: streaming command execution and directory syntax checks"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from tools.code_ops import CheckSyntaxTool, _run_streaming
+
+
+def test_output_truncation():
+    """Only the tail of a large output is kept, with a truncation note"""
+    cmd = [sys.executable, "-c", "print('x' * 5000); print('end')"]
+    result = _run_streaming(cmd, timeout=30, tail_bytes=1024)
+    print(result.stdout[:200])
+
+    assert result.returncode == 0
+    assert result.stdout.startswith("[... earlier output truncated, last 1 KiB shown ...]\n")
+    assert result.stdout.endswith("x\nend\n")
+    assert len(result.stdout.split("\n", 1)[1]) == 1024
+
+def test_small_output_untouched():
+    """Small outputs come back exactly like subprocess.run(text=True)"""
+    cmd = [sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"]
+    result = _run_streaming(cmd, timeout=30)
+
+    assert result.returncode == 3
+    assert result.stdout == "out\n"
+    assert result.stderr == "err\n"
+
+def test_timeout_with_background_child():
+    """A background child holding the pipes open does not outlive the timeout"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pidfile = os.path.join(tmp, "sleep.pid")
+        start = time.monotonic()
+        try:
+            # The background sleeper starts its own process group so it can be reaped below
+            sleeper = f"{sys.executable} -c 'import os, time; os.setsid(); time.sleep(5)'"
+            _run_streaming(f"{sleeper} & echo $! > {pidfile}; echo hi", timeout=1, shell=True)
+            assert False, "expected TimeoutExpired"
+        except subprocess.TimeoutExpired as e:
+            print(f"Timed out as expected: {e}")
+        finally:
+            with open(pidfile) as f:
+                pgid = int(f.read())
+            try:
+                os.killpg(pgid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+        assert time.monotonic() - start < 3
+
+def test_syntax_check_skips_hidden_folders():
+    """Directory syntax checks ignore hidden folders such as .tox"""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, ".tox", "py38"))
+        os.makedirs(os.path.join(tmp, "pkg"))
+        with open(os.path.join(tmp, ".tox", "py38", "broken.py"), "w") as f:
+            f.write("def broken(:\n")
+        with open(os.path.join(tmp, "pkg", "ok.py"), "w") as f:
+            f.write("x = 1\n")
+
+        result = CheckSyntaxTool().execute(filepath=tmp)
+        print(result.message)
+
+        assert result.success
+        assert result.data["files"] == 1
+
+if __name__ == "__main__":
+    test_output_truncation()
+    test_small_output_untouched()
+    test_timeout_with_background_child()
+    test_syntax_check_skips_hidden_folders()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Test file tools: large-file previews, string parameters and directory sizes"""
+
+import os
+import tempfile
+
+import tools.file_ops as file_ops
+from tools.file_ops import ListFilesTool, ReadFileTool, MMAP_PREVIEW_THRESHOLD
+
+
+def _write(directory, name, data):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+def test_mmap_preview_matches_full_read():
+    """Files above the mmap threshold read the same as with return_content"""
+    reader = ReadFileTool()
+    line_endings = {"lf": b"\n", "crlf": b"\r\n", "cr": b"\r"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, ending in line_endings.items():
+            line = "é".encode() + b"x" * 97 + ending
+            path = _write(tmp, f"{name}.txt", line * 1000)
+            assert os.path.getsize(path) > MMAP_PREVIEW_THRESHOLD
+
+            preview = reader.execute(filepath=path)
+            full = reader.execute(filepath=path, return_content=True)
+            print(f"{name}: {preview.message.splitlines()[0]}")
+
+            assert preview.success and full.success
+            assert preview.message == full.message
+            assert preview.data["lines"] == 1000
+
+def test_mmap_preview_rejects_binary_tail():
+    """Invalid UTF-8 past the previewed lines is still reported as unreadable"""
+    reader = ReadFileTool()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write(tmp, "bad.txt", b"ok\n" * 40000 + b"\xff\xfe\n")
+
+        for return_content in (False, True):
+            result = reader.execute(filepath=path, return_content=return_content)
+            print(result.message)
+            assert not result.success
+            assert "binary or encoding issue" in result.message
+
+def test_mmap_preview_validates_across_slices():
+    """Multi-byte characters split between validation slices are still accepted"""
+    reader = ReadFileTool()
+    real_chunk = file_ops.MMAP_VALIDATE_CHUNK
+    file_ops.MMAP_VALIDATE_CHUNK = 7
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            good = _write(tmp, "good.txt", "é€𝄞x\n".encode() * 10000)
+            cut = _write(tmp, "cut.txt", b"ok\n" * 40000 + "é".encode()[:1])
+            
+            result = reader.execute(filepath=good)
+            assert result.success and result.data["lines"] == 10000
+            
+            result = reader.execute(filepath=cut)
+            print(result.message)
+            assert not result.success
+            assert "binary or encoding issue" in result.message
+    finally:
+        file_ops.MMAP_VALIDATE_CHUNK = real_chunk
+
+def test_return_content_string_flag():
+    """LLM-parsed "false"/"true" strings are honoured like booleans"""
+    reader = ReadFileTool()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write(tmp, "small.txt", b"hello\n")
+
+        assert "content" not in reader.execute(filepath=path, return_content="false").data
+        assert reader.execute(filepath=path, return_content="True").data["content"] == "hello\n"
+
+def test_dir_sizes_skips_unreadable_directories():
+    """One unreadable subdirectory does not fail the whole listing"""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "ok"))
+        os.makedirs(os.path.join(tmp, "locked", "inner"))
+        _write(os.path.join(tmp, "ok"), "a.txt", b"12345")
+        _write(os.path.join(tmp, "locked", "inner"), "b.txt", b"123")
+        locked = os.path.join(tmp, "locked", "inner")
+
+        real_scandir = os.scandir
+        def scandir(path="."):
+            if os.fspath(path) == locked:
+                raise PermissionError(13, "Permission denied", path)
+            return real_scandir(path)
+
+        os.scandir = scandir
+        try:
+            result = ListFilesTool().execute(directory=tmp, dir_sizes="true")
+        finally:
+            os.scandir = real_scandir
+
+        print(result.message)
+        assert result.success
+        assert "📁 locked/ (0 bytes)" in result.message
+        assert "📁 ok/ (5 bytes)" in result.message
+
+if __name__ == "__main__":
+    test_mmap_preview_matches_full_read()
+    test_mmap_preview_rejects_binary_tail()
+    test_mmap_preview_validates_across_slices()
+    test_return_content_string_flag()
+    test_dir_sizes_skips_unreadable_directories()
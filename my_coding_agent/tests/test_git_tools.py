@@ -60,6 +60,77 @@ def test_git_tools_direct():
     print(result)
     print("-" * 50)
 
+def test_parse_porcelain_v2():
+    """Test the git status parser on canned porcelain v2 output"""
+    from tools.git_tools import GitStatusTool
+    
+    h = b"0" * 40
+    output = b"\n".join([
+        b"# branch.oid " + h,
+        b"# branch.head feature/x",
+        b"# branch.upstream origin/feature/x",
+        b"# branch.ab +2 -1",
+        b"1 M. N... 100644 100644 100644 " + h + b" " + h + b" staged.py",
+        b"1 .M N... 100644 100644 100644 " + h + b" " + h + b" dir/modified file.py",
+        b"1 AD N... 000000 100644 000000 " + h + b" " + h + b" added_then_deleted.py",
+        b"2 R. N... 100644 100644 100644 " + h + b" " + h + b" R100 new name.py\told name.py",
+        b"u AA N... 000000 100644 100644 100644 " + h + b" " + h + b" " + h + b" both_added.py",
+        b"? untracked \xc3\xa9.txt",
+        b"! ignored.pyc",
+        b"",
+    ])
+    
+    status = GitStatusTool()._parse_porcelain_v2(output)
+    print(status)
+    
+    assert status.branch == "feature/x"
+    assert (status.ahead, status.behind) == (2, 1)
+    assert status.staged == [
+        "M staged.py",
+        "A added_then_deleted.py",
+        "R old name.py -> new name.py",
+        "A both_added.py",
+    ]
+    assert status.modified == ["M dir/modified file.py", "D added_then_deleted.py"]
+    assert status.untracked == ["untracked é.txt"]
+    assert not status.clean
+    
+    # Detached HEAD without upstream, nothing changed
+    status = GitStatusTool()._parse_porcelain_v2(b"# branch.oid " + h + b"\n# branch.head (detached)\n")
+    assert status.branch == "HEAD"
+    assert (status.ahead, status.behind) == (0, 0)
+    assert status.clean
+
+def test_diff_max_lines_counts_raw_lines():
+    """max_lines caps the lines read from git diff, not the formatted output"""
+    import os
+    import subprocess
+    import tempfile
+    from tools.git_tools import GitDiffTool
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        git = ["git", "-C", tmp, "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        path = os.path.join(tmp, "f.txt")
+        subprocess.run(git + ["init", "-q"], check=True)
+        with open(path, "w") as f:
+            f.write("".join(f"old {i}\n" for i in range(10)))
+        subprocess.run(git + ["add", "f.txt"], check=True)
+        subprocess.run(git + ["commit", "-q", "-m", "init"], check=True)
+        with open(path, "w") as f:
+            f.write("".join(f"new {i}\n" for i in range(10)))
+        
+        # 5 header lines (diff, index, ---, +++, @@) followed by 20 changed lines
+        result = GitDiffTool().execute(directory=tmp, max_lines="9")
+        print(result)
+        assert sum(line.startswith(("🔴", "🟢")) for line in result.splitlines()) == 4
+        assert "Diff truncated after 9 lines" in result
+        
+        result = GitDiffTool().execute(directory=tmp, max_lines="25")
+        assert sum(line.startswith(("🔴", "🟢")) for line in result.splitlines()) == 20
+        assert "truncated" not in result
+
 if __name__ == "__main__":
     test_git_tools()
     test_git_tools_direct()
+    test_parse_porcelain_v2()
+    test_diff_max_lines_counts_raw_lines()
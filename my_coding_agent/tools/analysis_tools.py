@@ -5,9 +5,18 @@ import ast
 import os
 import re
 import subprocess
-from typing import Dict, List, Optional, Tuple, Any
+from bisect import bisect_right
+from typing import Dict, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from .file_ops import read_text
+
+
+# Node types that each add one branch to cyclomatic complexity
+_DECISION_NODES = frozenset({
+    ast.If, ast.While, ast.For, ast.AsyncFor, ast.ExceptHandler, ast.With, ast.AsyncWith
+})
 
 
 @dataclass
@@ -21,6 +30,105 @@ class AnalysisResult:
     summary: str = ""
 
 
+@dataclass
+class AnalysisContext:
+    """Source and parsed AST of a file, shared by the analysis passes"""
+    source: str
+    tree: Optional[ast.AST]
+    syntax_error: Optional[SyntaxError] = None
+
+
+# Line-oriented security checks: (pattern, type, message, severity).
+# Patterns run over the whole file, so whitespace classes exclude '\n' ([^\S\n])
+# to keep every match on a single line.
+_SECURITY_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), vuln_type, message,
+     'high' if vuln_type in ('sql_injection', 'command_injection', 'code_injection') else 'medium')
+    for pattern, vuln_type, message in [
+        # SQL Injection risks
+        (r'execute[^\S\n]*\([^\S\n]*["\'].*%.*["\']', 'sql_injection', 'Potential SQL injection vulnerability'),
+        (r'cursor\.execute[^\S\n]*\([^\S\n]*.*\+.*\)', 'sql_injection', 'SQL query concatenation detected'),
+
+        # Command injection
+        (r'os\.system[^\S\n]*\(.*\+', 'command_injection', 'Command injection risk with string concatenation'),
+        (r'subprocess\.(call|run|Popen)[^\S\n]*\(.*shell[^\S\n]*=[^\S\n]*True', 'command_injection', 'Shell=True with subprocess is risky'),
+
+        # Hardcoded secrets
+        (r'(password|secret|key|token|api_key)[^\S\n]*=[^\S\n]*["\'][^"\'\n]{8,}["\']', 'hardcoded_secret', 'Hardcoded secret detected'),
+        (r'["\'][A-Za-z0-9+/]{20,}={0,2}["\']', 'potential_secret', 'Potential base64 encoded secret'),
+
+        # Insecure random
+        (r'import[^\S\n]+random\b', 'weak_random', 'Using random module for security purposes is not cryptographically secure'),
+
+        # Pickle security
+        (r'pickle\.loads?[^\S\n]*\(', 'pickle_security', 'Pickle deserialization can execute arbitrary code'),
+
+        # Eval/exec usage
+        (r'\beval[^\S\n]*\(', 'code_injection', 'eval() can execute arbitrary code'),
+        (r'\bexec[^\S\n]*\(', 'code_injection', 'exec() can execute arbitrary code'),
+
+        # Insecure HTTP
+        (r'http://[^"\'\s]+', 'insecure_http', 'Insecure HTTP URL detected'),
+
+        # Debug mode
+        (r'debug[^\S\n]*=[^\S\n]*True', 'debug_mode', 'Debug mode enabled in production code'),
+    ]
+]
+
+# Linter checks, also run over the whole file with single-line patterns
+MAX_LINE_LENGTH = 100
+_LONG_LINE_RE = re.compile(r'^.{%d,}' % (MAX_LINE_LENGTH + 1), re.MULTILINE)
+_TODO_RE = re.compile(r'#.*\b(TODO|FIXME|HACK|XXX)\b', re.IGNORECASE)
+# Same as \bprint\s*\( but starting with a literal, which lets re skip
+# ahead to candidate positions instead of trying every character
+_PRINT_RE = re.compile(r'p(?<!\wp)rint[^\S\n]*\(')
+# Secrets are only looked for on lines that assign a string literal
+_STRING_ASSIGN_RE = re.compile(r'=[^\S\n]*["\']')
+_LINT_SECRET_RE = re.compile(r'(password|secret|key|token)\s*=\s*["\'][^"\']+["\']', re.IGNORECASE)
+
+_NEWLINE_RE = re.compile('\n')
+
+
+def _line_starts(content: str) -> List[int]:
+    """Offsets where each line starts, so match positions map back to line numbers"""
+    starts = [0]
+    starts.extend(match.end() for match in _NEWLINE_RE.finditer(content))
+    return starts
+
+
+def _matching_lines(pattern: re.Pattern, content: str, line_starts: List[int]) -> Set[int]:
+    """1-based numbers of the lines where pattern matches"""
+    return {bisect_right(line_starts, match.start()) for match in pattern.finditer(content)}
+
+
+def _line_text(content: str, line_starts: List[int], line_no: int) -> str:
+    """Text of a 1-based line, without its newline"""
+    start = line_starts[line_no - 1]
+    end = line_starts[line_no] - 1 if line_no < len(line_starts) else len(content)
+    return content[start:end]
+
+
+@lru_cache(maxsize=32)
+def _parse_source(path: str, mtime_ns: int, size: int) -> AnalysisContext:
+    """Read and parse a file once per (path, mtime, size)"""
+    source = read_text(path)
+    
+    try:
+        tree = ast.parse(source)
+        syntax_error = None
+    except SyntaxError as e:
+        tree = None
+        syntax_error = e
+    
+    return AnalysisContext(source=source, tree=tree, syntax_error=syntax_error)
+
+
+def load_analysis_context(full_path: str) -> AnalysisContext:
+    """Get the (cached) analysis context for a file"""
+    st = os.stat(full_path)
+    return _parse_source(os.path.abspath(full_path), st.st_mtime_ns, st.st_size)
+
+
 class PythonLinterTool:
     """Python code linting using built-in AST and pattern matching"""
     
@@ -35,16 +143,22 @@ class PythonLinterTool:
             if not filepath.endswith('.py'):
                 return f"❌ Not a Python file: {filepath}"
             
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            return self.analyze_with_ctx(filepath, load_analysis_context(full_path)).summary
             
+        except Exception as e:
+            return f"❌ Linting failed: {e}"
+    
+    def analyze_with_ctx(self, filepath: str, ctx: AnalysisContext) -> AnalysisResult:
+        """Lint an already loaded and parsed file, keeping the issue list alongside the report"""
+        try:
+            content = ctx.source
             issues = []
             
             # Syntax check using AST
-            try:
-                tree = ast.parse(content)
-                issues.extend(self._analyze_ast(tree, content))
-            except SyntaxError as e:
+            if ctx.tree is not None:
+                issues.extend(self._analyze_ast(ctx.tree, content))
+            else:
+                e = ctx.syntax_error
                 issues.append({
                     'type': 'syntax_error',
                     'line': e.lineno,
@@ -55,10 +169,10 @@ class PythonLinterTool:
             # Pattern-based checks
             issues.extend(self._pattern_checks(content))
             
-            return self._format_lint_results(filepath, issues)
+            return AnalysisResult('lint', filepath, issues, {}, summary=self._format_lint_results(filepath, issues))
             
         except Exception as e:
-            return f"❌ Linting failed: {e}"
+            return AnalysisResult('lint', filepath, [], {}, summary=f"❌ Linting failed: {e}")
     
     def _analyze_ast(self, tree: ast.AST, content: str) -> List[Dict[str, Any]]:
         """Analyze AST for code issues"""
@@ -66,8 +180,11 @@ class PythonLinterTool:
         lines = content.split('\n')
         
         for node in ast.walk(tree):
+            # Exact type checks are cheaper than isinstance and AST nodes are never subclassed
+            node_type = type(node)
+            
             # Check for unused variables (simplified)
-            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            if node_type is ast.Name and type(node.ctx) is ast.Store:
                 if node.id.startswith('_') and len(node.id) > 1:
                     issues.append({
                         'type': 'style',
@@ -77,7 +194,7 @@ class PythonLinterTool:
                     })
             
             # Check for long functions
-            if isinstance(node, ast.FunctionDef):
+            elif node_type is ast.FunctionDef:
                 if hasattr(node, 'end_lineno') and node.end_lineno:
                     func_length = node.end_lineno - node.lineno
                     if func_length > 50:
@@ -87,9 +204,8 @@ class PythonLinterTool:
                             'message': f"Function '{node.name}' is {func_length} lines long (consider breaking it down)",
                             'severity': 'warning'
                         })
-            
-            # Check for too many arguments
-            if isinstance(node, ast.FunctionDef):
+                
+                # Check for too many arguments
                 arg_count = len(node.args.args)
                 if arg_count > 5:
                     issues.append({
@@ -100,7 +216,7 @@ class PythonLinterTool:
                     })
             
             # Check for bare except clauses
-            if isinstance(node, ast.ExceptHandler):
+            elif node_type is ast.ExceptHandler:
                 if node.type is None:
                     issues.append({
                         'type': 'best_practice',
@@ -113,47 +229,35 @@ class PythonLinterTool:
     
     def _pattern_checks(self, content: str) -> List[Dict[str, Any]]:
         """Pattern-based code checks"""
-        issues = []
-        lines = content.split('\n')
+        line_starts = _line_starts(content)
+        found = []  # (line, check order, type, message, severity)
         
-        for i, line in enumerate(lines, 1):
-            # Check line length
-            if len(line) > 100:
-                issues.append({
-                    'type': 'style',
-                    'line': i,
-                    'message': f"Line too long ({len(line)} characters, max 100)",
-                    'severity': 'info'
-                })
-            
-            # Check for TODO/FIXME comments
-            if re.search(r'#.*\b(TODO|FIXME|HACK|XXX)\b', line, re.IGNORECASE):
-                issues.append({
-                    'type': 'maintenance',
-                    'line': i,
-                    'message': "TODO/FIXME comment found",
-                    'severity': 'info'
-                })
-            
-            # Check for print statements (potential debug code)
-            if re.search(r'\bprint\s*\(', line) and 'def ' not in line:
-                issues.append({
-                    'type': 'debug',
-                    'line': i,
-                    'message': "Print statement found (consider using logging)",
-                    'severity': 'info'
-                })
-            
-            # Check for hardcoded passwords/secrets
-            if re.search(r'(password|secret|key|token)\s*=\s*["\'][^"\']+["\']', line, re.IGNORECASE):
-                issues.append({
-                    'type': 'security',
-                    'line': i,
-                    'message': "Potential hardcoded secret detected",
-                    'severity': 'error'
-                })
+        # Check line length
+        for match in _LONG_LINE_RE.finditer(content):
+            length = match.end() - match.start()
+            found.append((bisect_right(line_starts, match.start()), 0, 'style',
+                          f"Line too long ({length} characters, max {MAX_LINE_LENGTH})", 'info'))
         
-        return issues
+        # Check for TODO/FIXME comments
+        for line_no in _matching_lines(_TODO_RE, content, line_starts):
+            found.append((line_no, 1, 'maintenance', "TODO/FIXME comment found", 'info'))
+        
+        # Check for print statements (potential debug code)
+        for line_no in _matching_lines(_PRINT_RE, content, line_starts):
+            if 'def ' not in _line_text(content, line_starts, line_no):
+                found.append((line_no, 2, 'debug', "Print statement found (consider using logging)", 'info'))
+        
+        # Check for hardcoded passwords/secrets
+        for line_no in _matching_lines(_STRING_ASSIGN_RE, content, line_starts):
+            if _LINT_SECRET_RE.search(_line_text(content, line_starts, line_no)):
+                found.append((line_no, 3, 'security', "Potential hardcoded secret detected", 'error'))
+        
+        # Report issues line by line, in check order within a line
+        found.sort(key=lambda f: f[:2])
+        return [
+            {'type': issue_type, 'line': line_no, 'message': message, 'severity': severity}
+            for line_no, _, issue_type, message, severity in found
+        ]
     
     def _format_lint_results(self, filepath: str, issues: List[Dict[str, Any]]) -> str:
         """Format linting results for display"""
@@ -192,6 +296,58 @@ class PythonLinterTool:
         return '\n'.join(lines)
 
 
+class _ComplexityVisitor(ast.NodeVisitor):
+    """Count functions and classes and tally cyclomatic complexity in one traversal.
+
+    Each FunctionDef gets its own counter; decision points inside nested
+    functions also count towards the enclosing ones, matching a walk of each
+    function's subtree.
+    """
+    
+    def __init__(self):
+        self.functions = []  # (depth, preorder index, node, complexity)
+        self.classes = 0
+        self.complexity = 1  # Base complexity of the whole tree
+        self._stack = []
+        self._depth = 0
+    
+    def _add(self, amount: int):
+        self.complexity += amount
+        if self._stack:
+            self._stack[-1] += amount
+    
+    def generic_visit(self, node: ast.AST):
+        # Decision points increase complexity
+        node_type = type(node)
+        if node_type in _DECISION_NODES:
+            self._add(1)
+        elif node_type is ast.BoolOp:
+            # And/Or operations
+            self._add(len(node.values) - 1)
+        
+        self._depth += 1
+        super().generic_visit(node)
+        self._depth -= 1
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        index = len(self.functions)
+        self.functions.append(None)  # Reserve the preorder slot
+        self._stack.append(1)
+        self.generic_visit(node)
+        complexity = self._stack.pop()
+        if self._stack:
+            self._stack[-1] += complexity - 1
+        self.functions[index] = (self._depth, index, node, complexity)
+    
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.classes += 1
+        self.generic_visit(node)
+    
+    def functions_by_level(self) -> List[Tuple[ast.FunctionDef, int]]:
+        """(node, complexity) pairs in ast.walk (breadth-first) order"""
+        return [(node, complexity) for _, _, node, complexity in sorted(self.functions, key=lambda f: f[:2])]
+
+
 class ComplexityAnalyzerTool:
     """Analyze code complexity metrics"""
     
@@ -206,15 +362,19 @@ class ComplexityAnalyzerTool:
             if not filepath.endswith('.py'):
                 return f"❌ Not a Python file: {filepath}"
             
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            return self.execute_with_ctx(filepath, load_analysis_context(full_path))
+            
+        except Exception as e:
+            return f"❌ Complexity analysis failed: {e}"
+    
+    def execute_with_ctx(self, filepath: str, ctx: AnalysisContext) -> str:
+        """Analyze complexity of an already loaded and parsed file"""
+        try:
+            if ctx.tree is None:
+                return f"❌ Syntax error in {filepath}: {ctx.syntax_error}"
             
-            try:
-                tree = ast.parse(content)
-                metrics = self._calculate_metrics(tree, content)
-                return self._format_complexity_results(filepath, metrics)
-            except SyntaxError as e:
-                return f"❌ Syntax error in {filepath}: {e}"
+            metrics = self._calculate_metrics(ctx.tree, ctx.source)
+            return self._format_complexity_results(filepath, metrics)
             
         except Exception as e:
             return f"❌ Complexity analysis failed: {e}"
@@ -238,56 +398,35 @@ class ComplexityAnalyzerTool:
         
         function_lengths = []
         
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                metrics['functions'] += 1
+        # One traversal gathers counts and per-function complexity
+        visitor = _ComplexityVisitor()
+        visitor.visit(tree)
+        metrics['functions'] = len(visitor.functions)
+        metrics['classes'] = visitor.classes
+        
+        for node, complexity in visitor.functions_by_level():
+            # Calculate function length
+            if hasattr(node, 'end_lineno') and node.end_lineno:
+                func_length = node.end_lineno - node.lineno
+                function_lengths.append(func_length)
+                metrics['max_function_length'] = max(metrics['max_function_length'], func_length)
                 
-                # Calculate function length
-                if hasattr(node, 'end_lineno') and node.end_lineno:
-                    func_length = node.end_lineno - node.lineno
-                    function_lengths.append(func_length)
-                    metrics['max_function_length'] = max(metrics['max_function_length'], func_length)
-                    
-                    # Calculate cyclomatic complexity for this function
-                    complexity = self._calculate_cyclomatic_complexity(node)
-                    
-                    metrics['function_details'].append({
-                        'name': node.name,
-                        'line': node.lineno,
-                        'length': func_length,
-                        'complexity': complexity,
-                        'args': len(node.args.args)
-                    })
-            
-            elif isinstance(node, ast.ClassDef):
-                metrics['classes'] += 1
+                metrics['function_details'].append({
+                    'name': node.name,
+                    'line': node.lineno,
+                    'length': func_length,
+                    'complexity': complexity,
+                    'args': len(node.args.args)
+                })
         
         if function_lengths:
             metrics['avg_function_length'] = sum(function_lengths) / len(function_lengths)
         
         # Overall cyclomatic complexity
-        metrics['cyclomatic_complexity'] = self._calculate_cyclomatic_complexity(tree)
+        metrics['cyclomatic_complexity'] = visitor.complexity
         
         return metrics
     
-    def _calculate_cyclomatic_complexity(self, node: ast.AST) -> int:
-        """Calculate cyclomatic complexity (simplified)"""
-        complexity = 1  # Base complexity
-        
-        for child in ast.walk(node):
-            # Decision points increase complexity
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.AsyncFor)):
-                complexity += 1
-            elif isinstance(child, ast.ExceptHandler):
-                complexity += 1
-            elif isinstance(child, (ast.With, ast.AsyncWith)):
-                complexity += 1
-            elif isinstance(child, ast.BoolOp):
-                # And/Or operations
-                complexity += len(child.values) - 1
-        
-        return complexity
-    
     def _format_complexity_results(self, filepath: str, metrics: Dict[str, Any]) -> str:
         """Format complexity analysis results"""
         lines = [f"📊 **Complexity Analysis for {filepath}:**\n"]
@@ -359,72 +498,49 @@ class SecurityScannerTool:
             if not filepath.endswith('.py'):
                 return f"❌ Not a Python file: {filepath}"
 
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            return self.analyze_with_ctx(filepath, load_analysis_context(full_path)).summary
+
+        except Exception as e:
+            return f"❌ Security scan failed: {e}"
 
+    def analyze_with_ctx(self, filepath: str, ctx: AnalysisContext) -> AnalysisResult:
+        """Scan an already loaded and parsed file, keeping the findings alongside the report"""
+        try:
             vulnerabilities = []
 
             # Pattern-based security checks
-            vulnerabilities.extend(self._check_security_patterns(content))
+            vulnerabilities.extend(self._check_security_patterns(ctx.source))
 
-            # AST-based security checks
-            try:
-                tree = ast.parse(content)
-                vulnerabilities.extend(self._check_ast_security(tree))
-            except SyntaxError:
-                pass  # Already handled in linter
+            # AST-based security checks (syntax errors are already reported by the linter)
+            if ctx.tree is not None:
+                vulnerabilities.extend(self._check_ast_security(ctx.tree))
 
-            return self._format_security_results(filepath, vulnerabilities)
+            return AnalysisResult('security', filepath, vulnerabilities, {},
+                                  summary=self._format_security_results(filepath, vulnerabilities))
 
         except Exception as e:
-            return f"❌ Security scan failed: {e}"
+            return AnalysisResult('security', filepath, [], {}, summary=f"❌ Security scan failed: {e}")
 
     def _check_security_patterns(self, content: str) -> List[Dict[str, Any]]:
         """Check for security patterns in code"""
         vulnerabilities = []
-        lines = content.split('\n')
-
-        security_patterns = [
-            # SQL Injection risks
-            (r'execute\s*\(\s*["\'].*%.*["\']', 'sql_injection', 'Potential SQL injection vulnerability'),
-            (r'cursor\.execute\s*\(\s*.*\+.*\)', 'sql_injection', 'SQL query concatenation detected'),
-
-            # Command injection
-            (r'os\.system\s*\(.*\+', 'command_injection', 'Command injection risk with string concatenation'),
-            (r'subprocess\.(call|run|Popen)\s*\(.*shell\s*=\s*True', 'command_injection', 'Shell=True with subprocess is risky'),
-
-            # Hardcoded secrets
-            (r'(password|secret|key|token|api_key)\s*=\s*["\'][^"\']{8,}["\']', 'hardcoded_secret', 'Hardcoded secret detected'),
-            (r'["\'][A-Za-z0-9+/]{20,}={0,2}["\']', 'potential_secret', 'Potential base64 encoded secret'),
-
-            # Insecure random
-            (r'import\s+random\b', 'weak_random', 'Using random module for security purposes is not cryptographically secure'),
-
-            # Pickle security
-            (r'pickle\.loads?\s*\(', 'pickle_security', 'Pickle deserialization can execute arbitrary code'),
-
-            # Eval/exec usage
-            (r'\beval\s*\(', 'code_injection', 'eval() can execute arbitrary code'),
-            (r'\bexec\s*\(', 'code_injection', 'exec() can execute arbitrary code'),
-
-            # Insecure HTTP
-            (r'http://[^"\'\s]+', 'insecure_http', 'Insecure HTTP URL detected'),
-
-            # Debug mode
-            (r'debug\s*=\s*True', 'debug_mode', 'Debug mode enabled in production code'),
-        ]
-
-        for i, line in enumerate(lines, 1):
-            for pattern, vuln_type, message in security_patterns:
-                if re.search(pattern, line, re.IGNORECASE):
-                    severity = 'high' if vuln_type in ['sql_injection', 'command_injection', 'code_injection'] else 'medium'
-                    vulnerabilities.append({
-                        'type': vuln_type,
-                        'line': i,
-                        'message': message,
-                        'severity': severity,
-                        'code': line.strip()
-                    })
+        
+        line_starts = _line_starts(content)
+        
+        # Scan the whole text once per pattern; a pattern is reported at most once per line
+        hits = set()
+        for index, (pattern, _, _, _) in enumerate(_SECURITY_PATTERNS):
+            hits.update((line_no, index) for line_no in _matching_lines(pattern, content, line_starts))
+        
+        for line_no, index in sorted(hits):
+            _, vuln_type, message, severity = _SECURITY_PATTERNS[index]
+            vulnerabilities.append({
+                'type': vuln_type,
+                'line': line_no,
+                'message': message,
+                'severity': severity,
+                'code': _line_text(content, line_starts, line_no).strip()
+            })
 
         return vulnerabilities
 
@@ -1,12 +1,17 @@
 """
 Base Tool Interface - Foundation for all agent tools
 """
+import sys
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional, List
 from dataclasses import dataclass
 
 
-@dataclass
+# slots=True is only accepted by dataclass on Python 3.10+
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class ToolResult:
     """Standardized tool result"""
     success: bool
@@ -1,11 +1,117 @@
 """
 Code Execution Tools - Safe code and command execution
 """
+import locale
 import os
+import re
 import subprocess
 import sys
-from typing import Dict, List
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Dict, List, Optional, Tuple
 from .base_tool import BaseTool, ToolResult
+from .file_ops import iter_files, read_text
+
+
+# Below this many files a process pool costs more to start than it saves
+PARALLEL_SYNTAX_THRESHOLD = 32
+
+
+def _compile_file(filepath: str) -> Optional[Tuple[str, int, str]]:
+    """Compile one file, returning (filepath, line, message) if it does not compile"""
+    try:
+        compile(read_text(filepath), filepath, 'exec')
+    except SyntaxError as e:
+        return filepath, e.lineno or 0, e.msg
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return filepath, 0, str(e)
+    return None
+
+
+# Substrings that get a shell command blocked outright, matched in one regex pass
+DANGEROUS_COMMANDS = (
+    'rm -rf', 'del /f', 'format', 'fdisk', 'mkfs',
+    'shutdown', 'reboot', 'halt', 'poweroff',
+    'dd if=', 'chmod 777', 'chown root'
+)
+_DANGEROUS_COMMAND_RE = re.compile('|'.join(map(re.escape, DANGEROUS_COMMANDS)))
+
+# Only the last this-many bytes of each output stream are kept in memory
+OUTPUT_TAIL_BYTES = 256 * 1024
+
+
+class _TailReader:
+    """Drain a pipe on a background thread, keeping only its last max_bytes"""
+    
+    def __init__(self, pipe: IO[bytes], max_bytes: int):
+        self._pipe = pipe
+        self._max_bytes = max_bytes
+        self._chunks = deque()
+        self._size = 0
+        self.truncated = False
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+    
+    def _drain(self):
+        with self._pipe:
+            for chunk in iter(lambda: self._pipe.read1(65536), b''):
+                self._chunks.append(chunk)
+                self._size += len(chunk)
+                while self._size - len(self._chunks[0]) >= self._max_bytes:
+                    self._size -= len(self._chunks.popleft())
+                    self.truncated = True
+    
+    def join(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+    
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+    
+    def text(self) -> str:
+        """Decode the kept output the way subprocess.run(text=True) would"""
+        data = b''.join(self._chunks)
+        if len(data) > self._max_bytes:
+            data = data[-self._max_bytes:]
+            self.truncated = True
+        text = data.decode(locale.getpreferredencoding(False), errors='replace')
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        if self.truncated:
+            text = f"[... earlier output truncated, last {self._max_bytes // 1024} KiB shown ...]\n{text}"
+        return text
+
+
+def _run_streaming(cmd, timeout: float, cwd: Optional[str] = None, shell: bool = False,
+                   tail_bytes: int = OUTPUT_TAIL_BYTES) -> subprocess.CompletedProcess:
+    """Run a command like subprocess.run(capture_output=True, text=True), with bounded memory.
+    
+    stdout and stderr are drained as they are produced and only their last
+    tail_bytes are kept. The timeout covers both the process and its output:
+    if the process is still running, or a background child still holds one of
+    the pipes open, once it expires, the process is killed and
+    subprocess.TimeoutExpired is raised.
+    """
+    deadline = time.monotonic() + timeout
+    proc = subprocess.Popen(cmd, shell=shell, cwd=cwd,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # The readers own the pipes and close them at EOF
+    stdout = _TailReader(proc.stdout, tail_bytes)
+    stderr = _TailReader(proc.stderr, tail_bytes)
+    try:
+        returncode = proc.wait(timeout=timeout)
+        for reader in (stdout, stderr):
+            reader.join(max(0.0, deadline - time.monotonic()))
+            if reader.is_alive():
+                raise subprocess.TimeoutExpired(cmd, timeout)
+    except subprocess.TimeoutExpired:
+        # Children of a shell may keep the pipes open after the kill, so
+        # leave the daemon readers to finish on their own instead of joining
+        proc.kill()
+        proc.wait()
+        raise
+    
+    return subprocess.CompletedProcess(cmd, returncode, stdout.text(), stderr.text())
 
 
 class RunPythonTool(BaseTool):
@@ -33,10 +139,8 @@ class RunPythonTool(BaseTool):
                 )
             
             # Execute the Python file
-            result = subprocess.run(
+            result = _run_streaming(
                 [sys.executable, filepath],
-                capture_output=True,
-                text=True,
                 timeout=30,  # 30 second timeout
                 cwd=os.path.dirname(os.path.abspath(filepath)) or "."
             )
@@ -99,26 +203,16 @@ class RunCommandTool(BaseTool):
         """Execute a shell command"""
         try:
             # Safety check - block dangerous commands
-            dangerous_commands = [
-                'rm -rf', 'del /f', 'format', 'fdisk', 'mkfs',
-                'shutdown', 'reboot', 'halt', 'poweroff',
-                'dd if=', 'chmod 777', 'chown root'
-            ]
-            
-            command_lower = command.lower()
-            for dangerous in dangerous_commands:
-                if dangerous in command_lower:
-                    return ToolResult(
-                        success=False,
-                        message=f"❌ Dangerous command blocked: {command}"
-                    )
+            if _DANGEROUS_COMMAND_RE.search(command.lower()):
+                return ToolResult(
+                    success=False,
+                    message=f"❌ Dangerous command blocked: {command}"
+                )
             
             # Execute the command
-            result = subprocess.run(
+            result = _run_streaming(
                 command,
                 shell=True,
-                capture_output=True,
-                text=True,
                 timeout=30,  # 30 second timeout
                 cwd=os.getcwd()
             )
@@ -176,7 +270,7 @@ class CheckSyntaxTool(BaseTool):
     def __init__(self):
         super().__init__(
             name="check_syntax",
-            description="Check Python file syntax for errors"
+            description="Check Python file syntax for errors (a directory checks every .py file in it)"
         )
     
     def execute(self, filepath: str, **kwargs) -> ToolResult:
@@ -188,6 +282,9 @@ class CheckSyntaxTool(BaseTool):
                     message=f"❌ File not found: {filepath}"
                 )
             
+            if os.path.isdir(filepath):
+                return self._check_directory(filepath)
+            
             if not filepath.endswith('.py'):
                 return ToolResult(
                     success=False,
@@ -195,15 +292,14 @@ class CheckSyntaxTool(BaseTool):
                 )
             
             # Read and compile the file
-            with open(filepath, 'r', encoding='utf-8') as f:
-                source_code = f.read()
+            source_code = read_text(filepath)
             
             try:
                 compile(source_code, filepath, 'exec')
                 return ToolResult(
                     success=True,
                     message=f"✅ Syntax check passed: {filepath}",
-                    data={"filepath": filepath, "lines": len(source_code.split('\n'))}
+                    data={"filepath": filepath, "lines": source_code.count('\n') + 1}
                 )
             except SyntaxError as e:
                 return ToolResult(
@@ -223,8 +319,38 @@ class CheckSyntaxTool(BaseTool):
                 message=f"❌ Error checking syntax: {e}"
             )
     
+    def _check_directory(self, directory: str) -> ToolResult:
+        """Check every Python file below a directory, compiling in parallel for large trees"""
+        files = list(iter_files(directory, ('.py',)))
+        
+        workers = os.cpu_count() or 1
+        if workers == 1 or len(files) < PARALLEL_SYNTAX_THRESHOLD:
+            results = map(_compile_file, files)
+            errors = [r for r in results if r]
+        else:
+            # compile() is CPU-bound and holds the GIL, so spread it across processes
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                errors = [r for r in executor.map(_compile_file, files, chunksize=16) if r]
+        
+        data = {
+            "directory": directory,
+            "files": len(files),
+            "errors": [{"filepath": path, "line": line, "error": msg} for path, line, msg in errors]
+        }
+        
+        if not errors:
+            return ToolResult(
+                success=True,
+                message=f"✅ Syntax check passed: {len(files)} Python files in {directory}",
+                data=data
+            )
+        
+        lines = [f"❌ Syntax errors in {len(errors)} of {len(files)} Python files in {directory}:"]
+        lines.extend(f"  • {path}:{line}: {msg}" for path, line, msg in errors)
+        return ToolResult(success=False, message='\n'.join(lines), data=data)
+    
     def get_parameters(self) -> Dict[str, str]:
-        return {"filepath": "Path to the Python file to check"}
+        return {"filepath": "Path to the Python file (or a directory of them) to check"}
 
 
 # Tool factory functions for easy registration
@@ -275,8 +275,8 @@ class CodeRefactorTool:
     
     def _calculate_improvements(self, original: str, refactored: str) -> str:
         """Calculate and format improvements made"""
-        original_lines = len(original.split('\n'))
-        refactored_lines = len(refactored.split('\n'))
+        original_lines = original.count('\n') + 1
+        refactored_lines = refactored.count('\n') + 1
         
         original_functions = len(re.findall(r'def \w+\(', original))
         refactored_functions = len(re.findall(r'def \w+\(', refactored))
@@ -1,11 +1,108 @@
 """
 File Operations Tools - Safe file system interactions
 """
+import codecs
+import mmap
 import os
-from typing import Dict, List
+import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from .base_tool import BaseTool, ToolResult
 
 
+# Files above this size are previewed through mmap instead of a full decode
+MMAP_PREVIEW_THRESHOLD = 64 * 1024
+
+# Slice size used to validate the unpreviewed rest of a mapped file
+MMAP_VALIDATE_CHUNK = 1024 * 1024
+
+# Upper bound on threads used to total subdirectory sizes in parallel
+DIR_SIZE_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+
+
+def count_lines(content: Union[str, bytes]) -> int:
+    """Count lines without splitting (a trailing newline does not start a new line)"""
+    if not content:
+        return 0
+    newline = b'\n' if isinstance(content, bytes) else '\n'
+    return content.count(newline) + (0 if content.endswith(newline) else 1)
+
+
+def read_text(filepath: str) -> str:
+    """Read a UTF-8 text file with universal newlines, like open(filepath, 'r').read().
+
+    Reads the raw bytes in one unbuffered readall() (sized from fstat) and
+    decodes them once, skipping the buffer layer, the text layer's
+    incremental decoder and its newline translation.
+    """
+    with open(filepath, 'rb', buffering=0) as f:
+        text = f.readall().decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _walk_scandir(path: str) -> Iterator[os.DirEntry]:
+    """Yield every entry below path, recursing with scandir instead of os.walk.
+
+    Unreadable directories are skipped, as in iter_files.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return
+    for entry in entries:
+        yield entry
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk_scandir(entry.path)
+
+
+# Folders that never hold project sources worth scanning (iter_files also skips
+# every hidden folder, e.g. .tox or .mypy_cache)
+SKIP_DIRS = frozenset({'.git', '__pycache__', 'node_modules', '.venv', 'venv'})
+
+
+def iter_files(root: str, extensions: Tuple[str, ...], skip_dirs: frozenset = SKIP_DIRS) -> Iterator[str]:
+    """Yield paths of files below root whose names end with one of extensions.
+
+    Subdirectories named in skip_dirs or starting with '.' are not entered.
+    Walks with an explicit stack of scandir calls. DirEntry.is_dir() is answered
+    from the directory listing, so unlike os.walk no entry needs its own stat.
+    """
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in skip_dirs and not entry.name.startswith('.'):
+                    stack.append(entry.path)
+            elif entry.name.endswith(extensions):
+                yield entry.path
+
+
+def _tree_size(path: str) -> int:
+    """Total size in bytes of the files below path.
+
+    DirEntry.stat(follow_symlinks=False) is cached on the entry (and on
+    Windows comes straight from the directory listing), so each file costs
+    at most one stat call. Files that vanish before they are stat'ed count as 0.
+    """
+    total = 0
+    for entry in _walk_scandir(path):
+        if not entry.is_dir(follow_symlinks=False):
+            try:
+                total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                pass
+    return total
+
+
 class ReadFileTool(BaseTool):
     """Tool for reading file contents"""
     
@@ -15,50 +112,67 @@ class ReadFileTool(BaseTool):
             description="Read and display file contents"
         )
     
-    def execute(self, filepath: str, **kwargs) -> ToolResult:
+    def execute(self, filepath: str, return_content: bool = False, **kwargs) -> ToolResult:
         """Read a file and return its contents"""
         try:
-            if not os.path.exists(filepath):
+            if isinstance(return_content, str):  # LLM-parsed parameters arrive as strings
+                return_content = return_content.lower() == "true"
+            
+            # One stat call covers existence, type and size
+            try:
+                st = os.stat(filepath)
+            except FileNotFoundError:
                 return ToolResult(
                     success=False,
                     message=f"❌ File not found: {filepath}"
                 )
             
-            if not os.path.isfile(filepath):
+            if not stat.S_ISREG(st.st_mode):
                 return ToolResult(
                     success=False,
                     message=f"❌ Path is not a file: {filepath}"
                 )
             
             # Check file size (safety check)
-            file_size = os.path.getsize(filepath)
+            file_size = st.st_size
             if file_size > 1024 * 1024:  # 1MB limit
                 return ToolResult(
                     success=False,
                     message=f"❌ File too large: {filepath} ({file_size} bytes)"
                 )
             
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            preview = None
+            if file_size > MMAP_PREVIEW_THRESHOLD and not return_content:
+                # Large file: only decode the lines we actually display
+                preview = self._preview_mapped(filepath)
             
-            # Format output nicely
-            lines = content.split('\n')
-            line_count = len(lines)
+            if preview is not None:
+                content = None
+                lines, line_count = preview
+            else:
+                content = read_text(filepath)
+                line_count = count_lines(content)
+                lines = content.split('\n', 100)[:min(line_count, 100)]  # Limit to first 100 lines
             
-            formatted_content = f"📄 **{filepath}** ({line_count} lines)\n"
-            formatted_content += "─" * 50 + "\n"
+            # Format output nicely, collecting parts and joining once
+            parts = [f"📄 **{filepath}** ({line_count} lines)\n", "─" * 50 + "\n"]
             
             # Add line numbers for better readability
-            for i, line in enumerate(lines[:100], 1):  # Limit to first 100 lines
-                formatted_content += f"{i:3d} | {line}\n"
+            parts.extend(f"{i:3d} | {line}\n" for i, line in enumerate(lines, 1))
             
             if line_count > 100:
-                formatted_content += f"... ({line_count - 100} more lines)\n"
+                parts.append(f"... ({line_count - 100} more lines)\n")
+            formatted_content = "".join(parts)
+            
+            # Only hold on to the full content when the caller asks for it
+            data = {"lines": line_count, "size": file_size}
+            if return_content:
+                data["content"] = content
             
             return ToolResult(
                 success=True,
                 message=formatted_content,
-                data={"content": content, "lines": line_count, "size": file_size}
+                data=data
             )
             
         except UnicodeDecodeError:
@@ -72,8 +186,47 @@ class ReadFileTool(BaseTool):
                 message=f"❌ Error reading file: {e}"
             )
     
+    def _preview_mapped(self, filepath: str, max_lines: int = 100) -> Optional[Tuple[List[str], int]]:
+        """Decode the first max_lines lines of a memory-mapped file and count the rest as bytes.
+
+        Returns None for files containing carriage returns, so their universal
+        newline handling stays with read_text. Like read_text, raises
+        UnicodeDecodeError if any part of the file is not valid UTF-8.
+        """
+        with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b'\r') != -1:
+                return None
+            
+            pos = -1
+            for _ in range(max_lines):
+                nxt = mm.find(b'\n', pos + 1)
+                if nxt == -1:
+                    pos = len(mm) - 1
+                    break
+                pos = nxt
+            
+            prefix = mm[:pos + 1]
+            newlines = prefix.count(b'\n')
+            
+            # Validate the rest slice by slice so binary tails fail like a full read
+            # without copying or decoding the whole file at once
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            for start in range(pos + 1, len(mm), MMAP_VALIDATE_CHUNK):
+                chunk = mm[start:start + MMAP_VALIDATE_CHUNK]
+                newlines += chunk.count(b'\n')
+                if not chunk.isascii() or decoder.getstate()[0]:
+                    decoder.decode(chunk)
+            decoder.decode(b'', final=True)
+            line_count = newlines + (0 if mm[-1:] == b'\n' else 1)
+        
+        lines = prefix.decode('utf-8').split('\n')
+        return lines[:min(line_count, max_lines)], line_count
+    
     def get_parameters(self) -> Dict[str, str]:
-        return {"filepath": "Path to the file to read"}
+        return {
+            "filepath": "Path to the file to read",
+            "return_content": "Include the full file text in the result data (default: false)"
+        }
 
 
 class WriteFileTool(BaseTool):
@@ -93,16 +246,26 @@ class WriteFileTool(BaseTool):
             
             # Create directory if needed
             directory = os.path.dirname(filepath)
-            if directory and not os.path.exists(directory):
-                os.makedirs(directory)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            # Encode once and reuse the bytes for the size stat
+            data = content.encode('utf-8')
             
-            # Write the file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Write the file with raw fd writes, skipping the Python io layers
+            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+            fd = os.open(filepath, flags, 0o666)
+            try:
+                view = memoryview(data)
+                while view:
+                    written = os.write(fd, view)
+                    view = view[written:]
+            finally:
+                os.close(fd)
             
             # Calculate stats
-            lines = len(content.split('\n'))
-            size = len(content.encode('utf-8'))
+            lines = count_lines(data)
+            size = len(data)
             
             action = "Updated" if file_exists else "Created"
             
@@ -135,9 +298,12 @@ class ListFilesTool(BaseTool):
             description="List files and directories"
         )
     
-    def execute(self, directory: str = ".", **kwargs) -> ToolResult:
+    def execute(self, directory: str = ".", dir_sizes: bool = False, **kwargs) -> ToolResult:
         """List directory contents"""
         try:
+            if isinstance(dir_sizes, str):  # LLM-parsed parameters arrive as strings
+                dir_sizes = dir_sizes.lower() == "true"
+            
             if not os.path.exists(directory):
                 return ToolResult(
                     success=False,
@@ -150,17 +316,23 @@ class ListFilesTool(BaseTool):
                     message=f"❌ Path is not a directory: {directory}"
                 )
             
+            # Single scandir pass - DirEntry caches the file type from readdir
+            with os.scandir(directory) as it:
+                entries = [entry for entry in it if not entry.name.startswith('.')]  # Skip hidden files
+            entries.sort(key=lambda entry: entry.name)
+
+            tree_sizes = self._tree_sizes(entries) if dir_sizes else {}
+
             items = []
-            for item in sorted(os.listdir(directory)):
-                if item.startswith('.'):
-                    continue  # Skip hidden files
-                
-                item_path = os.path.join(directory, item)
-                if os.path.isdir(item_path):
-                    items.append(f"📁 {item}/")
+            items_append = items.append  # Bound once for the per-entry loop
+            for entry in entries:
+                if entry.is_dir():
+                    if dir_sizes:
+                        items_append("📁 " + entry.name + "/ (" + str(tree_sizes[entry.path]) + " bytes)")
+                    else:
+                        items_append("📁 " + entry.name + "/")
                 else:
-                    size = os.path.getsize(item_path)
-                    items.append(f"📄 {item} ({size} bytes)")
+                    items_append("📄 " + entry.name + " (" + str(entry.stat().st_size) + " bytes)")
             
             if not items:
                 return ToolResult(
@@ -183,8 +355,23 @@ class ListFilesTool(BaseTool):
                 message=f"❌ Error listing directory: {e}"
             )
     
+    def _tree_sizes(self, entries: List[os.DirEntry]) -> Dict[str, int]:
+        """Total sizes of the subdirectories among entries, walked concurrently.
+
+        Walking is dominated by scandir/stat syscalls, which release the GIL,
+        so sibling trees overlap well on a thread pool.
+        """
+        paths = [entry.path for entry in entries if entry.is_dir()]
+        if len(paths) < 2:
+            return {path: _tree_size(path) for path in paths}
+        with ThreadPoolExecutor(max_workers=min(len(paths), DIR_SIZE_WORKERS)) as pool:
+            return dict(zip(paths, pool.map(_tree_size, paths)))
+    
     def get_parameters(self) -> Dict[str, str]:
-        return {"directory": "Directory to list (default: current directory)"}
+        return {
+            "directory": "Directory to list (default: current directory)",
+            "dir_sizes": "Show the total size of each subdirectory (default: false)"
+        }
 
 
 class CreateFolderTool(BaseTool):
@@ -199,14 +386,14 @@ class CreateFolderTool(BaseTool):
     def execute(self, folderpath: str, **kwargs) -> ToolResult:
         """Create a directory"""
         try:
-            if os.path.exists(folderpath):
+            try:
+                os.makedirs(folderpath)
+            except FileExistsError:
                 return ToolResult(
                     success=False,
                     message=f"❌ Folder already exists: {folderpath}"
                 )
 
-            os.makedirs(folderpath, exist_ok=True)
-
             return ToolResult(
                 success=True,
                 message=f"✅ Created folder: {folderpath}",
@@ -235,20 +422,22 @@ class DeleteFileTool(BaseTool):
     def execute(self, filepath: str, **kwargs) -> ToolResult:
         """Delete a file"""
         try:
-            if not os.path.exists(filepath):
+            try:
+                st = os.stat(filepath)
+            except FileNotFoundError:
                 return ToolResult(
                     success=False,
                     message=f"❌ File not found: {filepath}"
                 )
 
-            if not os.path.isfile(filepath):
+            if not stat.S_ISREG(st.st_mode):
                 return ToolResult(
                     success=False,
                     message=f"❌ Path is not a file: {filepath}"
                 )
 
             # Get file info before deletion
-            file_size = os.path.getsize(filepath)
+            file_size = st.st_size
 
             os.remove(filepath)
 
@@ -293,10 +482,10 @@ class DeleteFolderTool(BaseTool):
                     message=f"❌ Path is not a directory: {folderpath}"
                 )
 
-            # Count items before deletion
-            import shutil
+            # Count items before deletion (one scandir pass, no per-entry stat)
             try:
-                item_count = len(os.listdir(folderpath))
+                with os.scandir(folderpath) as it:
+                    item_count = sum(1 for _ in it)
                 shutil.rmtree(folderpath)
 
                 return ToolResult(
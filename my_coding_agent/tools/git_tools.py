@@ -1,12 +1,44 @@
 """
 Git Operations Tools - Version control integration
 """
+import shutil
 import subprocess
 import os
-from typing import Dict, List, Optional, Tuple
+import threading
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
 from dataclasses import dataclass
 
 
+@lru_cache(maxsize=None)
+def _git_executable() -> str:
+    """Absolute path to git, which subprocess needs to use posix_spawn"""
+    return shutil.which("git") or "git"
+
+
+def _git_command(args: List[str], directory: str) -> List[str]:
+    """Build a git command line that runs in `directory` via -C instead of cwd"""
+    return [_git_executable(), "-C", directory, *args]
+
+
+def _git(args: List[str], directory: str, timeout: Optional[float] = None,
+         text: bool = True) -> subprocess.CompletedProcess:
+    """Run git and capture its output.
+
+    Passing the directory with -C (rather than cwd=) and leaving close_fds off
+    lets CPython start git with posix_spawn instead of fork+exec. Python's own
+    descriptors are non-inheritable, so nothing leaks into the child.
+    """
+    return subprocess.run(
+        _git_command(args, directory),
+        capture_output=True,
+        text=text,
+        timeout=timeout,
+        close_fds=False
+    )
+
+
 @dataclass
 class GitStatus:
     """Git repository status information"""
@@ -25,20 +57,17 @@ class GitStatusTool:
     def execute(self, directory: str = ".") -> str:
         """Get Git status for repository"""
         try:
-            # Check if we're in a git repository
-            result = subprocess.run(
-                ["git", "rev-parse", "--is-inside-work-tree"],
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            # One porcelain v2 call reports branch, upstream tracking and file status.
+            # Output stays as bytes; only the paths we report get decoded.
+            result = _git(["status", "--porcelain=v2", "--branch"], directory, timeout=10, text=False)
             
             if result.returncode != 0:
-                return "❌ Not a Git repository"
+                stderr = result.stderr.decode('utf-8', errors='replace')
+                if "not a git repository" in stderr.lower():
+                    return "❌ Not a Git repository"
+                return f"❌ Git status failed: {stderr}"
             
-            # Get detailed status
-            status = self._get_git_status(directory)
+            status = self._parse_porcelain_v2(result.stdout)
             return self._format_status(status)
             
         except subprocess.TimeoutExpired:
@@ -46,46 +75,48 @@ class GitStatusTool:
         except Exception as e:
             return f"❌ Git status failed: {e}"
     
-    def _get_git_status(self, directory: str) -> GitStatus:
-        """Get detailed Git status information"""
-        
-        # Get current branch
-        branch_result = subprocess.run(
-            ["git", "branch", "--show-current"],
-            cwd=directory,
-            capture_output=True,
-            text=True
-        )
-        branch = branch_result.stdout.strip() or "HEAD"
-        
-        # Get ahead/behind info
-        ahead, behind = self._get_ahead_behind(directory)
-        
-        # Get file status
-        status_result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=directory,
-            capture_output=True,
-            text=True
-        )
-        
+    def _parse_porcelain_v2(self, output: bytes) -> GitStatus:
+        """Parse `git status --porcelain=v2 --branch` output"""
+        branch = "HEAD"
+        ahead = behind = 0
         staged = []
         modified = []
         untracked = []
         
-        for line in status_result.stdout.strip().split('\n'):
+        for line in output.split(b'\n'):
             if not line:
                 continue
-                
-            status_code = line[:2]
-            filename = line[3:]
             
-            if status_code[0] in ['A', 'M', 'D', 'R', 'C']:
-                staged.append(f"{status_code[0]} {filename}")
-            if status_code[1] in ['M', 'D']:
-                modified.append(f"{status_code[1]} {filename}")
-            if status_code == '??':
-                untracked.append(filename)
+            kind = line[:1]
+            if kind == b'#':
+                # Header: "# branch.head <name>", "# branch.ab +<ahead> -<behind>"
+                parts = line.split(b' ')
+                if parts[1] == b'branch.head' and parts[2] != b'(detached)':
+                    branch = parts[2].decode('utf-8', errors='replace')
+                elif parts[1] == b'branch.ab':
+                    ahead, behind = int(parts[2][1:]), int(parts[3][1:])
+                continue
+            
+            if kind == b'?':
+                untracked.append(line[2:].decode('utf-8', errors='replace'))
+                continue
+            
+            # Changed entries: "1 XY ... <path>", "2 XY ... <path>\t<orig>", "u XY ... <path>"
+            if kind == b'1':
+                path = line.split(b' ', 8)[8]
+            elif kind == b'2':
+                path, orig_path = line.split(b' ', 9)[9].split(b'\t', 1)
+                path = orig_path + b' -> ' + path
+            elif kind == b'u':
+                path = line.split(b' ', 10)[10]
+            else:
+                continue  # Ignored files ("!")
+            
+            index_status, worktree_status = line[2], line[3]
+            if index_status in b'AMDRC':
+                staged.append(f"{chr(index_status)} {path.decode('utf-8', errors='replace')}")
+            if worktree_status in b'MD':
+                modified.append(f"{chr(worktree_status)} {path.decode('utf-8', errors='replace')}")
         
         clean = not (staged or modified or untracked)
         
@@ -99,24 +130,6 @@ class GitStatusTool:
             clean=clean
         )
     
-    def _get_ahead_behind(self, directory: str) -> Tuple[int, int]:
-        """Get ahead/behind commit count"""
-        try:
-            result = subprocess.run(
-                ["git", "rev-list", "--left-right", "--count", "HEAD...@{upstream}"],
-                cwd=directory,
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                ahead, behind = map(int, result.stdout.strip().split())
-                return ahead, behind
-        except:
-            pass
-        
-        return 0, 0
-    
     def _format_status(self, status: GitStatus) -> str:
         """Format Git status for display"""
         lines = []
@@ -155,10 +168,11 @@ class GitStatusTool:
 class GitDiffTool:
     """Show Git diff for changes"""
     
-    def execute(self, filepath: str = "", staged: bool = False, directory: str = ".") -> str:
-        """Show Git diff"""
+    def execute(self, filepath: str = "", staged: bool = False, directory: str = ".", max_lines: int = 0) -> str:
+        """Show Git diff, stopping after max_lines diff lines when max_lines > 0"""
         try:
-            cmd = ["git", "diff"]
+            max_lines = int(max_lines)
+            cmd = ["diff"]
             
             if staged:
                 cmd.append("--staged")
@@ -166,61 +180,82 @@ class GitDiffTool:
             if filepath:
                 cmd.append(filepath)
             
-            result = subprocess.run(
-                cmd,
-                cwd=directory,
-                capture_output=True,
+            # Stream git's output straight into the formatter instead of buffering it all
+            timed_out = threading.Event()
+            with subprocess.Popen(
+                _git_command(cmd, directory),
+                close_fds=False,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=30,
                 encoding='utf-8',
                 errors='replace'
-            )
+            ) as proc:
+                timer = threading.Timer(30, lambda: (timed_out.set(), proc.kill()))
+                timer.start()
+                try:
+                    diff_lines = (line.rstrip('\n') for line in proc.stdout)
+                    if max_lines > 0:
+                        # Cap the raw lines read from git; anything left means the diff was cut short
+                        diff_lines = islice(diff_lines, max_lines)
+                    formatted = list(self._format_diff(diff_lines, filepath, staged))
+                    truncated = max_lines > 0 and proc.stdout.readline() != ''
+                    if truncated:
+                        proc.kill()
+                    stderr = proc.stderr.read()
+                    returncode = proc.wait()
+                finally:
+                    timer.cancel()
             
-            if result.returncode != 0:
-                return f"❌ Git diff failed: {result.stderr}"
+            if timed_out.is_set():
+                return "❌ Git diff timeout"
+            
+            if truncated:
+                formatted.append(f"\n✂️ **Diff truncated after {max_lines} lines**")
+            elif returncode != 0:
+                return f"❌ Git diff failed: {stderr}"
             
-            if not result.stdout.strip():
+            if len(formatted) == 1:  # Header only - git printed nothing
                 return "ℹ️ No changes to show"
             
-            return self._format_diff(result.stdout, filepath, staged)
+            return '\n'.join(formatted)
             
-        except subprocess.TimeoutExpired:
-            return "❌ Git diff timeout"
         except Exception as e:
             return f"❌ Git diff failed: {e}"
     
-    def _format_diff(self, diff_output: str, filepath: str, staged: bool) -> str:
-        """Format diff output for display"""
-        lines = []
-        
+    def _format_diff(self, diff_lines: Iterable[str], filepath: str, staged: bool) -> Iterator[str]:
+        """Format diff output for display, one line at a time"""
         # Header
         diff_type = "staged" if staged else "working tree"
         target = f" for {filepath}" if filepath else ""
-        lines.append(f"📋 **Git Diff ({diff_type}){target}:**\n")
+        yield f"📋 **Git Diff ({diff_type}){target}:**\n"
         
         # Process diff output
-        diff_lines = diff_output.split('\n')
         current_file = ""
         
         for line in diff_lines:
-            if line.startswith('diff --git'):
+            # Dispatch on the first character so each line needs at most one prefix check
+            c = line[:1]
+            if c == '+':
+                if not line.startswith('+++'):
+                    # Added line
+                    yield f"🟢 {line}"
+            elif c == '-':
+                if not line.startswith('---'):
+                    # Removed line
+                    yield f"🔴 {line}"
+            elif c == '@' and line.startswith('@@'):
+                # Hunk header
+                yield f"🔍 {line}"
+            elif c == 'd' and line.startswith('diff --git'):
                 # New file header
                 current_file = line.split()[-1][2:]  # Remove a/ prefix
-                lines.append(f"📄 **{current_file}**")
-            elif line.startswith('@@'):
-                # Hunk header
-                lines.append(f"🔍 {line}")
-            elif line.startswith('+') and not line.startswith('+++'):
-                # Added line
-                lines.append(f"🟢 {line}")
-            elif line.startswith('-') and not line.startswith('---'):
-                # Removed line
-                lines.append(f"🔴 {line}")
-            elif line.strip() and not line.startswith('index') and not line.startswith('+++') and not line.startswith('---'):
+                yield f"📄 **{current_file}**"
+            elif c == 'i' and line.startswith('index'):
+                continue
+            elif line.strip():
                 # Context line
-                lines.append(f"⚪ {line}")
-        
-        return '\n'.join(lines)
+                yield f"⚪ {line}"
 
 
 class GitAddTool:
@@ -229,29 +264,17 @@ class GitAddTool:
     def execute(self, filepath: str = ".", directory: str = ".") -> str:
         """Add files to staging area"""
         try:
-            result = subprocess.run(
-                ["git", "add", filepath],
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            # --verbose reports each staged path, so no follow-up status call is needed
+            result = _git(["add", "--verbose", filepath], directory, timeout=30)
             
             if result.returncode != 0:
                 return f"❌ Git add failed: {result.stderr}"
             
-            # Get what was added
-            status_result = subprocess.run(
-                ["git", "status", "--porcelain", "--staged"],
-                cwd=directory,
-                capture_output=True,
-                text=True
-            )
-            
+            # Lines look like: add 'path' / remove 'path'
             staged_files = []
-            for line in status_result.stdout.strip().split('\n'):
-                if line:
-                    staged_files.append(line[3:])  # Remove status code
+            for line in result.stdout.splitlines():
+                if line.startswith(("add '", "remove '")) and line.endswith("'"):
+                    staged_files.append(line[line.index("'") + 1:-1])
             
             if staged_files:
                 files_list = '\n'.join(f"  • {f}" for f in staged_files)
@@ -274,35 +297,21 @@ class GitCommitTool:
             if not message.strip():
                 return "❌ Commit message is required"
             
-            # Check if there are staged changes
-            status_result = subprocess.run(
-                ["git", "status", "--porcelain", "--staged"],
-                cwd=directory,
-                capture_output=True,
-                text=True
-            )
+            # Check if there are staged changes (exit code 1 means the index differs from HEAD)
+            staged_check = _git(["diff", "--cached", "--quiet"], directory)
             
-            if not status_result.stdout.strip():
+            if staged_check.returncode == 0:
                 return "❌ No staged changes to commit"
             
             # Perform commit
-            result = subprocess.run(
-                ["git", "commit", "-m", message],
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            result = _git(["commit", "-m", message], directory, timeout=30)
             
             if result.returncode != 0:
                 return f"❌ Git commit failed: {result.stderr}"
             
-            # Extract commit hash from output
-            commit_hash = ""
-            for line in result.stdout.split('\n'):
-                if 'commit' in line.lower() or line.startswith('['):
-                    commit_hash = line.strip()
-                    break
+            # The first line carries the branch and short hash: "[main abc1234] message"
+            first_line = result.stdout.split('\n', 1)[0]
+            commit_hash = first_line.strip() if first_line.startswith('[') else ""
             
             return f"✅ **Committed successfully**\n{commit_hash}\n\n📝 **Message:** {message}"
             
@@ -320,24 +329,14 @@ class GitPushTool:
         try:
             # Get current branch if not specified
             if not branch:
-                branch_result = subprocess.run(
-                    ["git", "branch", "--show-current"],
-                    cwd=directory,
-                    capture_output=True,
-                    text=True
-                )
+                branch_result = _git(["branch", "--show-current"], directory)
                 branch = branch_result.stdout.strip()
 
                 if not branch:
                     return "❌ Could not determine current branch"
 
             # Check if there are commits to push
-            ahead_result = subprocess.run(
-                ["git", "rev-list", "--count", f"{remote}/{branch}..HEAD"],
-                cwd=directory,
-                capture_output=True,
-                text=True
-            )
+            ahead_result = _git(["rev-list", "--count", f"{remote}/{branch}..HEAD"], directory)
 
             if ahead_result.returncode == 0:
                 ahead_count = int(ahead_result.stdout.strip())
@@ -345,13 +344,7 @@ class GitPushTool:
                     return "ℹ️ Already up to date - nothing to push"
 
             # Perform push
-            result = subprocess.run(
-                ["git", "push", remote, branch],
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            result = _git(["push", remote, branch], directory, timeout=60)
 
             if result.returncode != 0:
                 return f"❌ Git push failed: {result.stderr}"
@@ -370,20 +363,14 @@ class GitPullTool:
     def execute(self, remote: str = "origin", branch: str = "", directory: str = ".") -> str:
         """Pull changes from remote repository"""
         try:
-            cmd = ["git", "pull"]
+            cmd = ["pull"]
 
             if remote and branch:
                 cmd.extend([remote, branch])
             elif remote:
                 cmd.append(remote)
 
-            result = subprocess.run(
-                cmd,
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            result = _git(cmd, directory, timeout=60)
 
             if result.returncode != 0:
                 return f"❌ Git pull failed: {result.stderr}"
@@ -405,32 +392,24 @@ class GitLogTool:
     def execute(self, count: int = 10, oneline: bool = True, directory: str = ".") -> str:
         """Show Git commit history"""
         try:
-            cmd = ["git", "log", f"-{count}"]
+            cmd = ["log", f"-{count}"]
 
             if oneline:
                 cmd.append("--oneline")
             else:
                 cmd.extend(["--pretty=format:%h - %an, %ar : %s"])
 
-            result = subprocess.run(
-                cmd,
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            result = _git(cmd, directory, timeout=30)
 
             if result.returncode != 0:
                 return f"❌ Git log failed: {result.stderr}"
 
-            if not result.stdout.strip():
+            commits = [line for line in result.stdout.splitlines() if line]
+            if not commits:
                 return "ℹ️ No commits found"
 
             lines = [f"📜 **Git History (last {count} commits):**\n"]
-
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    lines.append(f"  • {line}")
+            lines.extend(f"  • {line}" for line in commits)
 
             return '\n'.join(lines)
 
@@ -462,19 +441,14 @@ class GitBranchTool:
 
     def _list_branches(self, directory: str) -> str:
         """List all branches"""
-        result = subprocess.run(
-            ["git", "branch", "-a"],
-            cwd=directory,
-            capture_output=True,
-            text=True
-        )
+        result = _git(["branch", "-a"], directory)
 
         if result.returncode != 0:
             return f"❌ Failed to list branches: {result.stderr}"
 
         lines = ["🌿 **Git Branches:**\n"]
 
-        for line in result.stdout.strip().split('\n'):
+        for line in result.stdout.splitlines():
             if line:
                 if line.startswith('*'):
                     lines.append(f"  ➤ {line[2:]} (current)")
@@ -488,12 +462,7 @@ class GitBranchTool:
         if not branch_name:
             return "❌ Branch name is required"
 
-        result = subprocess.run(
-            ["git", "checkout", "-b", branch_name],
-            cwd=directory,
-            capture_output=True,
-            text=True
-        )
+        result = _git(["checkout", "-b", branch_name], directory)
 
         if result.returncode != 0:
             return f"❌ Failed to create branch: {result.stderr}"
@@ -505,12 +474,7 @@ class GitBranchTool:
         if not branch_name:
             return "❌ Branch name is required"
 
-        result = subprocess.run(
-            ["git", "checkout", branch_name],
-            cwd=directory,
-            capture_output=True,
-            text=True
-        )
+        result = _git(["checkout", branch_name], directory)
 
         if result.returncode != 0:
             return f"❌ Failed to switch branch: {result.stderr}"
@@ -522,12 +486,7 @@ class GitBranchTool:
         if not branch_name:
             return "❌ Branch name is required"
 
-        result = subprocess.run(
-            ["git", "branch", "-d", branch_name],
-            cwd=directory,
-            capture_output=True,
-            text=True
-        )
+        result = _git(["branch", "-d", branch_name], directory)
 
         if result.returncode != 0:
             return f"❌ Failed to delete branch: {result.stderr}"
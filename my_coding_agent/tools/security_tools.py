@@ -4,47 +4,91 @@ Security and Dependency Analysis Tools - Continuation of analysis_tools.py
 import ast
 import os
 import re
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
 
 
-def check_ast_security(tree: ast.AST) -> List[Dict[str, Any]]:
-    """AST-based security checks"""
-    vulnerabilities = []
+# Builtins that can execute arbitrary code
+_DANGEROUS_FUNCTIONS = frozenset({'eval', 'exec', 'compile'})
+
+# (module, attribute) calls -> (type, message, severity)
+_DANGEROUS_ATTRS = {
+    ('pickle', 'loads'): ('pickle_security', "pickle.loads() can execute arbitrary code", 'high'),
+}
+
+# Requirement line: package name followed by an optional version specifier (==, >=, ~=, ...)
+_DEP_RE = re.compile(r'^([A-Za-z0-9_.-]+)\s*([<>=!~].*)?')
+
+# Package names flagged as potentially risky
+_RISKY_PACKAGES = frozenset({'pickle', 'eval', 'exec'})
+
+# Dependency files the analyzer looks for, in report order
+_REQUIREMENT_FILES = ('requirements.txt', 'requirements-dev.txt', 'Pipfile', 'pyproject.toml')
+
+# Score deductions per (lint errors, warnings, info, security high, medium, low)
+_QUALITY_WEIGHTS = (10, 5, 1, 20, 10, 2)
+
+
+class _SecurityVisitor:
+    """Collect security findings, only running checks on Call and Assert nodes.
+
+    Nodes are visited in ast.walk's breadth-first order. The report truncates
+    each severity list, so the order decides which findings are shown.
+    """
+    
+    def __init__(self):
+        self.vulnerabilities = []
+    
+    def visit(self, tree: ast.AST):
+        visit_call, visit_assert = self.visit_Call, self.visit_Assert
+        for node in ast.walk(tree):
+            node_type = type(node)
+            if node_type is ast.Call:
+                visit_call(node)
+            elif node_type is ast.Assert:
+                visit_assert(node)
     
-    for node in ast.walk(tree):
-        # Check for dangerous function calls
-        if isinstance(node, ast.Call):
-            if isinstance(node.func, ast.Name):
-                func_name = node.func.id
-                
-                if func_name in ['eval', 'exec', 'compile']:
-                    vulnerabilities.append({
-                        'type': 'dangerous_function',
-                        'line': node.lineno,
-                        'message': f"Dangerous function '{func_name}' can execute arbitrary code",
-                        'severity': 'high'
-                    })
+    def visit_Call(self, node: ast.Call):
+        # Check for dangerous function calls (exact type checks; AST nodes are never subclassed)
+        func = node.func
+        func_type = type(func)
+        if func_type is ast.Name:
+            func_name = func.id
             
-            elif isinstance(node.func, ast.Attribute):
-                if node.func.attr == 'loads' and isinstance(node.func.value, ast.Name):
-                    if node.func.value.id == 'pickle':
-                        vulnerabilities.append({
-                            'type': 'pickle_security',
-                            'line': node.lineno,
-                            'message': "pickle.loads() can execute arbitrary code",
-                            'severity': 'high'
-                        })
+            if func_name in _DANGEROUS_FUNCTIONS:
+                self.vulnerabilities.append({
+                    'type': 'dangerous_function',
+                    'line': node.lineno,
+                    'message': f"Dangerous function '{func_name}' can execute arbitrary code",
+                    'severity': 'high'
+                })
         
-        # Check for assert statements (can be disabled with -O)
-        if isinstance(node, ast.Assert):
-            vulnerabilities.append({
-                'type': 'assert_security',
-                'line': node.lineno,
-                'message': "Assert statements are removed with -O optimization",
-                'severity': 'low'
-            })
+        elif func_type is ast.Attribute and type(func.value) is ast.Name:
+            finding = _DANGEROUS_ATTRS.get((func.value.id, func.attr))
+            if finding:
+                vuln_type, message, severity = finding
+                self.vulnerabilities.append({
+                    'type': vuln_type,
+                    'line': node.lineno,
+                    'message': message,
+                    'severity': severity
+                })
     
-    return vulnerabilities
+    def visit_Assert(self, node: ast.Assert):
+        # Check for assert statements (can be disabled with -O)
+        self.vulnerabilities.append({
+            'type': 'assert_security',
+            'line': node.lineno,
+            'message': "Assert statements are removed with -O optimization",
+            'severity': 'low'
+        })
+
+
+def check_ast_security(tree: ast.AST) -> List[Dict[str, Any]]:
+    """AST-based security checks"""
+    visitor = _SecurityVisitor()
+    visitor.visit(tree)
+    return visitor.vulnerabilities
 
 
 def format_security_results(filepath: str, vulnerabilities: List[Dict[str, Any]]) -> str:
@@ -95,20 +139,35 @@ def format_security_results(filepath: str, vulnerabilities: List[Dict[str, Any]]
     return '\n'.join(lines)
 
 
+@lru_cache(maxsize=64)
+def _find_dependency_files(directory: str, mtime_ns: int) -> Tuple[str, ...]:
+    """Dependency files present in directory.
+
+    Keyed on the directory's mtime, which changes whenever an entry is added,
+    removed or renamed, so repeated calls skip the directory read.
+    """
+    # One directory read instead of a stat per candidate name
+    try:
+        with os.scandir(directory) as it:
+            names = {entry.name for entry in it if entry.is_file()}
+    except (FileNotFoundError, NotADirectoryError):
+        return ()
+    return tuple(req_file for req_file in _REQUIREMENT_FILES if req_file in names)
+
+
 class DependencyAnalyzerTool:
     """Analyze project dependencies for security and updates"""
     
     def execute(self, directory: str = ".") -> str:
         """Analyze project dependencies"""
         try:
-            # Look for requirements files
-            req_files = ['requirements.txt', 'requirements-dev.txt', 'Pipfile', 'pyproject.toml']
-            found_files = []
-            
-            for req_file in req_files:
-                full_path = os.path.join(directory, req_file)
-                if os.path.exists(full_path):
-                    found_files.append(req_file)
+            # Look for requirements files (cached until the directory's entries change)
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                found_files = ()
+            else:
+                found_files = _find_dependency_files(os.path.realpath(directory), mtime_ns)
             
             if not found_files:
                 return "ℹ️ No dependency files found (requirements.txt, Pipfile, pyproject.toml)"
@@ -126,40 +185,45 @@ class DependencyAnalyzerTool:
     def _analyze_requirements_file(self, filepath: str) -> str:
         """Analyze a requirements file"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            lines = [line.strip() for line in content.split('\n') if line.strip() and not line.startswith('#')]
-            
-            if not lines:
-                return "  No dependencies found"
-            
-            dependencies = []
+            saw_entries = False
+            dependency_count = 0
             issues = []
+            risky = []
             
-            for line in lines:
-                # Parse dependency line
-                dep_info = self._parse_dependency(line)
-                if dep_info:
-                    dependencies.append(dep_info)
+            # Stream the file line by line and check each dependency as it is parsed
+            with open(filepath, 'rb') as f:
+                for raw in f:
+                    line = raw.strip().decode('utf-8', 'replace')
+                    if not line or line.startswith('#'):
+                        continue
+                    saw_entries = True
+                    
+                    # Parse dependency line
+                    dep_info = self._parse_dependency(line)
+                    if not dep_info:
+                        continue
+                    dependency_count += 1
                     
                     # Check for potential issues
                     if not dep_info['version']:
                         issues.append(f"  ⚠️ {dep_info['name']}: No version specified (unpinned dependency)")
                     elif dep_info['version'].startswith('>='):
                         issues.append(f"  ⚠️ {dep_info['name']}: Using >= version constraint (potential compatibility issues)")
+                    
+                    # Check for known risky packages (simplified)
+                    if dep_info['name'].lower() in _RISKY_PACKAGES:
+                        risky.append(f"  🚨 {dep_info['name']}: Potentially risky package")
             
-            result_lines = [f"  📊 Found {len(dependencies)} dependencies"]
+            if not saw_entries:
+                return "  No dependencies found"
+            
+            result_lines = [f"  📊 Found {dependency_count} dependencies"]
             
             if issues:
                 result_lines.append("  \n  🔍 **Issues:**")
                 result_lines.extend(issues)
             
-            # Check for known risky packages (simplified)
-            risky_packages = ['pickle', 'eval', 'exec', 'os.system']
-            for dep in dependencies:
-                if any(risky in dep['name'].lower() for risky in risky_packages):
-                    result_lines.append(f"  🚨 {dep['name']}: Potentially risky package")
+            result_lines.extend(risky)
             
             return '\n'.join(result_lines)
             
@@ -169,7 +233,7 @@ class DependencyAnalyzerTool:
     def _parse_dependency(self, line: str) -> Optional[Dict[str, str]]:
         """Parse a dependency line"""
         # Handle different formats: package==1.0, package>=1.0, package, etc.
-        match = re.match(r'^([a-zA-Z0-9_-]+)([><=!]+.*)?', line)
+        match = _DEP_RE.match(line)
         if match:
             name = match.group(1)
             version = match.group(2) if match.group(2) else ""
@@ -192,23 +256,31 @@ class CodeQualityTool:
                 return f"❌ Not a Python file: {filepath}"
             
             # Import the analysis tools
-            from .analysis_tools import PythonLinterTool, ComplexityAnalyzerTool, SecurityScannerTool
+            from .analysis_tools import (
+                PythonLinterTool, ComplexityAnalyzerTool, SecurityScannerTool, load_analysis_context
+            )
+            
+            # Read and parse the file once for all three passes
+            ctx = load_analysis_context(full_path)
             
             # Run all analyses
             linter = PythonLinterTool()
             complexity = ComplexityAnalyzerTool()
             security = SecurityScannerTool()
             
-            lint_result = linter.execute(filepath, directory)
-            complexity_result = complexity.execute(filepath, directory)
-            security_result = security.execute(filepath, directory)
+            # All three passes work on the loaded context, with no I/O left to overlap
+            lint_report = linter.analyze_with_ctx(filepath, ctx)
+            complexity_result = complexity.execute_with_ctx(filepath, ctx)
+            security_report = security.analyze_with_ctx(filepath, ctx)
+            lint_result = lint_report.summary
+            security_result = security_report.summary
             
             # Combine results
             lines = [f"🎯 **Comprehensive Code Quality Report for {filepath}:**\n"]
             
-            # Extract scores and issues
-            lint_issues = self._extract_issue_count(lint_result)
-            security_issues = self._extract_security_count(security_result)
+            # Count issues straight from the structured findings
+            lint_issues = self._count_by_severity(lint_report.issues, ('error', 'warning', 'info'))
+            security_issues = self._count_by_severity(security_report.issues, ('high', 'medium', 'low'))
             
             # Overall quality score
             quality_score = self._calculate_quality_score(lint_issues, security_issues)
@@ -242,32 +314,17 @@ class CodeQualityTool:
         except Exception as e:
             return f"❌ Code quality analysis failed: {e}"
     
-    def _extract_issue_count(self, lint_result: str) -> Dict[str, int]:
-        """Extract issue counts from lint result"""
-        errors = len(re.findall(r'🔴', lint_result))
-        warnings = len(re.findall(r'🟡', lint_result))
-        info = len(re.findall(r'🔵', lint_result))
-        return {'errors': errors, 'warnings': warnings, 'info': info}
+    @staticmethod
+    def _count_by_severity(issues: List[Dict[str, Any]], levels: Tuple[str, str, str]) -> Tuple[int, int, int]:
+        """Count issues at each severity level, in the order given"""
+        counts = dict.fromkeys(levels, 0)
+        for issue in issues:
+            severity = issue['severity']
+            if severity in counts:
+                counts[severity] += 1
+        return tuple(counts[level] for level in levels)
     
-    def _extract_security_count(self, security_result: str) -> Dict[str, int]:
-        """Extract security issue counts"""
-        high = len(re.findall(r'🚨', security_result))
-        medium = len(re.findall(r'⚠️', security_result))
-        low = len(re.findall(r'ℹ️', security_result))
-        return {'high': high, 'medium': medium, 'low': low}
-    
-    def _calculate_quality_score(self, lint_issues: Dict[str, int], security_issues: Dict[str, int]) -> int:
+    def _calculate_quality_score(self, lint_issues: Tuple[int, int, int], security_issues: Tuple[int, int, int]) -> int:
         """Calculate overall quality score"""
-        score = 100
-        
-        # Deduct for lint issues
-        score -= lint_issues['errors'] * 10
-        score -= lint_issues['warnings'] * 5
-        score -= lint_issues['info'] * 1
-        
-        # Deduct for security issues
-        score -= security_issues['high'] * 20
-        score -= security_issues['medium'] * 10
-        score -= security_issues['low'] * 2
-        
+        score = 100 - sum(c * w for c, w in zip(lint_issues + security_issues, _QUALITY_WEIGHTS))
         return max(0, score)